@@ -1,12 +1,15 @@
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QPushButton, QLabel, QGridLayout, QVBoxLayout,
-    QComboBox, QMessageBox, QDialog, QTableWidget, QTableWidgetItem,
+    QComboBox, QMessageBox, QDialog, QTableView,
     QHBoxLayout, QHeaderView, QAbstractItemView
 )
 from PyQt6.QtGui import QFont
-from PyQt6.QtCore import Qt, QTimer, QPropertyAnimation, QRect, QUrl
+from PyQt6.QtCore import (
+    Qt, QTimer, QPropertyAnimation, QRect, QUrl, QAbstractTableModel, QModelIndex
+)
 import sys
 import random
+import functools
 from datetime import datetime
 import json 
 import sqlite3
@@ -14,9 +17,43 @@ from PyQt6.QtMultimedia import QSoundEffect
 from PyQt6.QtGui import QIcon
 
 
+# Move history encoding
+#Each move is packed into one byte: player*9 + row*3 + col, with X=0 and O=1
+_PLAYER_CODES = {"X": 0, "O": 1}
+_PLAYERS = ("X", "O")
+
+def _pack_moves(moves):
+    """Packs a list of move dictionaries into bytes, one byte per move."""
+    return bytes(_PLAYER_CODES[m['player']] * 9 + m['row'] * 3 + m['col'] for m in moves)
+
+def _unpack_moves(value):
+    """
+    Decodes a stored move_history value back into a list of move dictionaries.
+    Accepts packed bytes, or the JSON string written by older versions.
+    Raises ValueError if the value can't be decoded.
+    """
+    if value is None:
+        return []
+    if isinstance(value, str): # Legacy rows stored as JSON text
+        return json.loads(value)
+    moves = []
+    for code in value:
+        player, cell = divmod(code, 9)
+        if player >= len(_PLAYERS):
+            raise ValueError(f"Invalid packed move byte: {code}")
+        row, col = divmod(cell, 3)
+        moves.append({'row': row, 'col': col, 'player': _PLAYERS[player]})
+    return moves
+
+
 # TicTicToc game database
 class GameHistoryDB:
     """Manages SQLite database operations for Tic Tac Toe game history."""
+    # Fixed DELETE sizes, largest first, so repeated deletes reuse the same cached statements
+    _DELETE_CHUNK_SIZES = (64, 16, 4, 1)
+    _DELETE_TEMPLATES = {n: f"DELETE FROM games WHERE id IN ({','.join('?' * n)})"
+                         for n in _DELETE_CHUNK_SIZES}
+
     def __init__(self, db_file="game_history.db"):
         self.db_file = db_file
         self.conn = None
@@ -27,8 +64,15 @@ class GameHistoryDB:
     def _connect(self):
         """Establishes a connection to the SQLite database."""
         try:
-            self.conn = sqlite3.connect(self.db_file)
+            # Autocommit mode: transactions are opened explicitly where batching matters
+            self.conn = sqlite3.connect(self.db_file, isolation_level=None, check_same_thread=False)
             self.cursor = self.conn.cursor()
+            # WAL journaling with NORMAL sync needs far fewer fsyncs per commit
+            self.cursor.execute("PRAGMA journal_mode=WAL")
+            self.cursor.execute("PRAGMA synchronous=NORMAL")
+            self.cursor.execute("PRAGMA temp_store=MEMORY")
+            self.cursor.execute("PRAGMA cache_size=-20000")
+            self.cursor.execute("PRAGMA mmap_size=268435456")
         except sqlite3.Error as e:
             print(f"Database connection error: {e}")
             self.conn = None #Ensure conn is None on failure
@@ -42,10 +86,11 @@ class GameHistoryDB:
                         id INTEGER PRIMARY KEY AUTOINCREMENT,
                         mode TEXT,
                         winner TEXT,
-                        move_history TEXT, -- Stored as JSON string
-                        date TEXT
+                        move_history BLOB, -- Packed moves, one byte each (older rows: JSON string)
+                        date TEXT DEFAULT (datetime('now', 'localtime'))
                     )
                 """)
+                self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_games_date ON games(date DESC)")
                 self.conn.commit()
             except sqlite3.Error as e:
                 print(f"Error creating table: {e}")
@@ -62,27 +107,44 @@ class GameHistoryDB:
             "move_history": [{"row":0, "col":0, "player":"X"}, ...],
             "date": "YYYY-MM-DD HH:MM:SS"
         }
+        "date" is optional; SQLite fills in the current local time when it's missing.
+        Returns the new game's ID, or False on failure.
+        """
+        new_ids = self.insert_games([game_data])
+        return new_ids[0] if new_ids else False
+
+    def insert_games(self, games):
+        """
+        Inserts several game records in a single transaction.
+        games is a list of dictionaries in the same shape accepted by insert_game.
+        Returns the list of new game IDs in insertion order (empty on failure).
         """
         if not self.conn or not self.cursor:
             print("Database not connected. Cannot insert game.")
-            return False
+            return []
+        if not games:
+            return []
 
         try:
-            #Serialize move_history list to a JSON string
-            move_history_json = json.dumps(game_data.get('move_history', []))
-            
-            self.cursor.execute("""
-                INSERT INTO games (mode, winner, move_history, date)
-                VALUES (?, ?, ?, ?)
-            """, (game_data.get('mode', 'N/A'),
-                  game_data.get('winner', 'N/A'),
-                  move_history_json,
-                  game_data.get('date', datetime.now().strftime("%Y-%m-%d %H:%M:%S"))))
-            self.conn.commit()
-            return True
+            #Pack each move_history list into bytes once per row
+            rows = [(game_data.get('mode', 'N/A'),
+                     game_data.get('winner', 'N/A'),
+                     _pack_moves(game_data.get('move_history', [])),
+                     game_data.get('date'))
+                    for game_data in games]
+
+            with self.conn: # One commit for the whole batch
+                self.cursor.execute("BEGIN")
+                self.cursor.executemany("""
+                    INSERT INTO games (mode, winner, move_history, date)
+                    VALUES (?, ?, ?, COALESCE(?, datetime('now', 'localtime')))
+                """, rows)
+                # AUTOINCREMENT ids within one transaction are consecutive
+                last_id = self.cursor.execute("SELECT last_insert_rowid()").fetchone()[0]
+            return list(range(last_id - len(rows) + 1, last_id + 1))
         except sqlite3.Error as e:
             print(f"Error inserting game: {e}")
-            return False
+            return []
 
     def get_all_games(self):
         """
@@ -99,12 +161,12 @@ class GameHistoryDB:
             
             games_list = []
             for row in rows:
-                game_id, mode, winner, move_history_json, date_str = row
+                game_id, mode, winner, move_history_value, date_str = row
                 
                 moves = []
                 try:
-                    moves = json.loads(move_history_json)
-                except json.JSONDecodeError:
+                    moves = _unpack_moves(move_history_value)
+                except ValueError:
                     print(f"Warning: Failed to decode move_history for game ID {game_id}")
                     #Keep moves as empty list or handle as desired
                 
@@ -122,6 +184,72 @@ class GameHistoryDB:
         
     
 
+    def get_games_page(self, offset, limit):
+        """
+        Retrieves one page of game records, newest first, without move_history.
+        Use get_move_history to fetch the moves of a single game on demand.
+        Returns a list of dictionaries.
+        """
+        if not self.cursor:
+            print("Database not connected. Cannot retrieve games.")
+            return []
+
+        try:
+            self.cursor.execute("""
+                SELECT id, mode, winner, date FROM games
+                ORDER BY id DESC LIMIT ? OFFSET ?
+            """, (limit, offset))
+            return [{"id": game_id, "mode": mode, "winner": winner, "date": date_str}
+                    for game_id, mode, winner, date_str in self.cursor.fetchall()]
+        except sqlite3.Error as e:
+            print(f"Error retrieving games: {e}")
+            return []
+
+    def get_game(self, game_id):
+        """
+        Retrieves a single game record without move_history, in the same shape
+        as get_games_page rows. Returns None if the game doesn't exist.
+        """
+        if not self.cursor:
+            print("Database not connected. Cannot retrieve games.")
+            return None
+
+        try:
+            self.cursor.execute("SELECT id, mode, winner, date FROM games WHERE id = ?", (game_id,))
+            row = self.cursor.fetchone()
+        except sqlite3.Error as e:
+            print(f"Error retrieving games: {e}")
+            return None
+
+        if row is None:
+            return None
+        game_id, mode, winner, date_str = row
+        return {"id": game_id, "mode": mode, "winner": winner, "date": date_str}
+
+    def get_move_history(self, game_id):
+        """
+        Retrieves and decodes the move_history of a single game.
+        Returns a list of move dictionaries (empty if missing or undecodable).
+        """
+        if not self.cursor:
+            print("Database not connected. Cannot retrieve games.")
+            return []
+
+        try:
+            self.cursor.execute("SELECT move_history FROM games WHERE id = ?", (game_id,))
+            row = self.cursor.fetchone()
+        except sqlite3.Error as e:
+            print(f"Error retrieving games: {e}")
+            return []
+
+        if row is None:
+            return []
+        try:
+            return _unpack_moves(row[0])
+        except ValueError:
+            print(f"Warning: Failed to decode move_history for game ID {game_id}")
+            return []
+
     def delete_games_by_ids(self, ids):
         """
         Deletes game records by a list of IDs.
@@ -131,10 +259,16 @@ class GameHistoryDB:
             return False
 
         try:
-            # Create a placeholder string for the IN clause (e.g., '?, ?, ?')
-            placeholders = ','.join('?' for _ in ids)
-            self.cursor.execute(f"DELETE FROM games WHERE id IN ({placeholders})", ids)
-            self.conn.commit()
+            with self.conn: # One commit however many chunks are needed
+                self.cursor.execute("BEGIN IMMEDIATE")
+                # Greedily cover the ids with the fixed-size templates (also keeps
+                # each statement well under SQLite's host-parameter limit)
+                start = 0
+                while start < len(ids):
+                    remaining = len(ids) - start
+                    size = next(n for n in self._DELETE_CHUNK_SIZES if n <= remaining)
+                    self.cursor.execute(self._DELETE_TEMPLATES[size], ids[start:start + size])
+                    start += size
             return True
         except sqlite3.Error as e:
             print(f"Error deleting games: {e}")
@@ -148,41 +282,131 @@ class GameHistoryDB:
             self.cursor = None
             print("Database connection closed.")
 
+    # History table model
+class GameHistoryModel(QAbstractTableModel):
+    """
+    Table model over GameHistoryDB that loads rows one page at a time.
+    The view only asks for visible cells, so move history is fetched and
+    formatted lazily the first time its cell is painted.
+    """
+    HEADERS = ["ID", "Mode", "Winner", "Move History", "Date"]
+    PAGE_SIZE = 200
+
+    def __init__(self, db_manager, parent=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self._rows = []
+        self._has_more = True
+
+    def refresh(self):
+        """Drops the loaded rows and reloads from the first page."""
+        self.beginResetModel()
+        self._rows = []
+        self._has_more = True
+        self.endResetModel()
+        self.fetchMore(QModelIndex())
+
+    def prepend_game(self, game):
+        """Shows a newly saved game as the first row without reloading the table."""
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self._rows.insert(0, game)
+        self.endInsertRows()
+
+    def remove_games_at(self, rows):
+        """Removes the given row numbers from the model without reloading the table."""
+        for row in sorted(set(rows), reverse=True): # Bottom-up so earlier row numbers stay valid
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self._rows[row]
+            self.endRemoveRows()
+
+    def game_id(self, row):
+        """Returns the database ID of the game shown at the given row."""
+        return self._rows[row]["id"]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and self._has_more
+
+    def fetchMore(self, parent):
+        """Appends the next page of games from the database."""
+        if parent.isValid() or not self._has_more:
+            return
+        page = self.db_manager.get_games_page(len(self._rows), self.PAGE_SIZE)
+        if len(page) < self.PAGE_SIZE:
+            self._has_more = False
+        if page:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+            self._rows.extend(page)
+            self.endInsertRows()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        game = self._rows[index.row()]
+        column = index.column()
+        if column == 0:
+            return str(game["id"])
+        if column == 1:
+            return game.get("mode", "N/A")
+        if column == 2:
+            return game.get("winner", "N/A")
+        if column == 3:
+            if "moves_display" not in game:
+                # Format move_history once on first paint; later paints reuse the string
+                moves = self.db_manager.get_move_history(game["id"])
+                game["moves_display"] = ", ".join(f"{m['player']}:({m['row']},{m['col']})" for m in moves)
+            return game["moves_display"]
+        return game.get("date", "N/A")
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
     # History Window 
 class HistoryWindow(QDialog):
     """A dialog window to display and manage game history using the GameHistoryDB."""
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, db=None):
         super().__init__(parent)
         self.setWindowTitle("Game History")
         self.setGeometry(200, 200, 800, 600)
         self.setStyleSheet("background-color: #282c34; color: white;")
 
-        self.db_manager = GameHistoryDB() # Create an instance of the database manager
+        # Reuse the caller's long-lived connection; only open (and own) one if none is given
+        self._owns_db = db is None
+        self.db_manager = GameHistoryDB() if self._owns_db else db
 
         self.init_ui()
         self.load_history()
 
     def closeEvent(self, event):
-        """Overrides the close event to ensure database connection is closed."""
-        self.db_manager.close_connection()
+        """Overrides the close event to close the database connection if this window opened it."""
+        if self._owns_db:
+            self.db_manager.close_connection()
         super().closeEvent(event)
 
     def init_ui(self):
         main_layout = QVBoxLayout()
 
         # Table for history display
-        self.history_table = QTableWidget()
-        self.history_table.setColumnCount(5)
-        self.history_table.setHorizontalHeaderLabels(["ID", "Mode", "Winner", "Move History", "Date"])
+        self.history_model = GameHistoryModel(self.db_manager, self)
+        self.history_table = QTableView()
+        self.history_table.setModel(self.history_model)
         self.history_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.history_table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background-color: #3e4451;
                 color: white;
                 gridline-color: #555;
                 border: 1px solid #555;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 5px;
             }
             QHeaderView::section {
@@ -234,21 +458,7 @@ class HistoryWindow(QDialog):
         """
         Loads game history from the SQLite database using GameHistoryDB.
         """
-        self.history_table.setRowCount(0) # Clear existing rows
-        games = self.db_manager.get_all_games() # Get data from DB manager
-        
-        for idx, game in enumerate(games):
-            self.history_table.insertRow(idx)
-            self.history_table.setItem(idx, 0, QTableWidgetItem(str(game["id"])))
-            self.history_table.setItem(idx, 1, QTableWidgetItem(game.get("mode", "N/A")))
-            self.history_table.setItem(idx, 2, QTableWidgetItem(game.get("winner", "N/A")))
-            
-            # Format move_history for display
-            moves_display = ", ".join([f"{m['player']}:({m['row']},{m['col']})" for m in game.get("move_history", [])])
-            self.history_table.setItem(idx, 3, QTableWidgetItem(moves_display))
-            
-            date_str = game.get("date", "N/A")
-            self.history_table.setItem(idx, 4, QTableWidgetItem(date_str))
+        self.history_model.refresh() # Rows are paged in by the model as the view needs them
 
     def save_current_game_to_db(self):
         """
@@ -257,10 +467,13 @@ class HistoryWindow(QDialog):
         """
         parent_game = self.parent() # Access the main TicTacToe window
         if hasattr(parent_game, 'last_game_data') and parent_game.last_game_data:
-            if self.db_manager.insert_game(parent_game.last_game_data): # Insert using DB manager
+            game_id = self.db_manager.insert_game(parent_game.last_game_data) # Insert using DB manager
+            if game_id:
                 parent_game.last_game_data = None # Clear after saving
+                saved_game = self.db_manager.get_game(game_id)
+                if saved_game:
+                    self.history_model.prepend_game(saved_game) # Add just the new row
                 QMessageBox.information(self, "Save Game", "Last game saved successfully!")
-                self.load_history() # Refresh table after saving
             else:
                 QMessageBox.critical(self, "Save Game Error", "Failed to save game to database.")
         else:
@@ -281,45 +494,135 @@ class HistoryWindow(QDialog):
         if reply == QMessageBox.StandardButton.No:
             return
 
-        game_ids_to_delete = []
-        for index in selected_rows:
-            game_id = self.history_table.item(index.row(), 0).text()
-            game_ids_to_delete.append(int(game_id))
+        rows_to_delete = [index.row() for index in selected_rows]
+        game_ids_to_delete = [self.history_model.game_id(row) for row in rows_to_delete]
         
         if self.db_manager.delete_games_by_ids(game_ids_to_delete): # Delete using DB manager
+            self.history_model.remove_games_at(rows_to_delete) # Drop just the deleted rows
             QMessageBox.information(self, "Success", "Selected game(s) deleted!")
-            self.load_history() # Refresh table after deleting
         else:
             QMessageBox.critical(self, "Delete Error", "Failed to delete game(s) from database.")
 
 
+# Board line helpers
+#The 8 winning lines as (row, col) triples, for list-of-lists boards
+_WIN_LINES = (
+    tuple(((r, 0), (r, 1), (r, 2)) for r in range(3)) +            # Rows
+    tuple(((0, c), (1, c), (2, c)) for c in range(3)) +            # Columns
+    (((0, 0), (1, 1), (2, 2)), ((0, 2), (1, 1), (2, 0)))           # Diagonals
+)
+
+#Smart AI replies while at most X's first mark is on the board, keyed by that mark's cell
+#(None = empty board); all of these are optimal, so the full search can be skipped
+_OPENING_BOOK = {
+    None: (0, 0),
+    (1, 1): (0, 0),                                                 # Center -> corner
+    (0, 0): (1, 1), (0, 2): (1, 1), (2, 0): (1, 1), (2, 2): (1, 1), # Corner -> center
+    (0, 1): (1, 1), (1, 0): (1, 1), (1, 2): (1, 1), (2, 1): (1, 1)  # Edge -> center
+}
+
+# Minimax search helpers
+#Each player's marks are a 9-bit integer: bit index = row*3 + col
+_FULL_BOARD = 0x1FF
+_WIN_MASKS = (
+    0b000000111, 0b000111000, 0b111000000, # Rows
+    0b001001001, 0b010010010, 0b100100100, # Columns
+    0b100010001, 0b001010100               # Diagonals
+)
+
+def _encode_board(board):
+    """Packs a 3x3 board (list of lists of strings) into (x_bb, o_bb) bitboards."""
+    x_bb = o_bb = 0
+    for r in range(3):
+        for c in range(3):
+            if board[r][c] == "X":
+                x_bb |= 1 << (r * 3 + c)
+            elif board[r][c] == "O":
+                o_bb |= 1 << (r * 3 + c)
+    return x_bb, o_bb
+
+def _has_won(bb):
+    """Checks whether a single player's bitboard covers any winning line."""
+    return any((bb & mask) == mask for mask in _WIN_MASKS)
+
+@functools.lru_cache(maxsize=None)
+def _minimax_search(x_bb, o_bb, is_maximizing_player, alpha=-float('inf'), beta=float('inf')):
+    """
+    Minimax with alpha-beta pruning over X/O bitboards.
+    Memoized on the position and the (alpha, beta) window, since a pruned
+    score is only a bound that is valid for the window it was searched with.
+    Returns (score, move_index); move_index is None on terminal positions.
+    """
+    if _has_won(o_bb):
+        return 1, None
+    if _has_won(x_bb):
+        return -1, None
+    empty = ~(x_bb | o_bb) & _FULL_BOARD
+    if not empty:
+        return 0, None
+
+    best_move = None
+    best_score = -float('inf') if is_maximizing_player else float('inf')
+    while empty: # Lowest set bit first keeps row-major move order
+        bit = empty & -empty
+        empty &= empty - 1
+        if is_maximizing_player: # AI's turn ('O')
+            score, _ = _minimax_search(x_bb, o_bb | bit, False, alpha, beta)
+            if score > best_score:
+                best_score = score
+                best_move = bit.bit_length() - 1
+            alpha = max(alpha, best_score)
+        else: #Player's turn ('X')
+            score, _ = _minimax_search(x_bb | bit, o_bb, True, alpha, beta)
+            if score < best_score:
+                best_score = score
+                best_move = bit.bit_length() - 1
+            beta = min(beta, best_score)
+        if beta <= alpha:
+            break
+    return best_score, best_move
+
+
 class TicTacToeGame(QWidget):
     """The main Tic Tac Toe game window."""
+    # Shared by all board buttons; the "mark" property picks the text colour
+    CELL_STYLE = """
+        QPushButton { background-color: #2e2e3e; color: white; border-radius: 10px; }
+        QPushButton[mark="X"] { color: #00ffff; }
+        QPushButton[mark="O"] { color: #ff5e78; }
+    """
+
     def __init__(self):
         super().__init__() 
-        #Game_sound
-        try:
-            self.game_sound = QSoundEffect()
-            self.game_sound.setSource(QUrl.fromLocalFile(r"c:\Users\85512\Downloads\game-music-loop-6-144641 (online-audio-converter.com).wav"))
-            self.game_sound.setVolume(0.5)
-            self.game_sound.play()
-        except Exception as e:
-            QMessageBox.warning(self, "Sound Error", f"Could not load sound file: {e}")
+        #Sounds are loaded by init_sounds once the event loop starts, so they don't delay the first paint
+        self.game_sound = None
+        self.win_sound = None
+        self.draw_sound = None
 
         self.setWindowTitle("Tic Tac Toe")
         self.setStyleSheet("background-color: #1e1e2f;")
         self.current_player = "X"
         self.buttons = [[None for _ in range(3)] for _ in range(3)]
+        self.board = [["" for _ in range(3)] for _ in range(3)] #Source of truth for cell marks; buttons only display it
+        self.empty_cells = {(r, c) for r in range(3) for c in range(3)} #Kept in sync with self.board on every move
         self.mode = "Random AI"
         self._game_moves = [] #To store moves for the current game
         self.last_game_data = None #To hold data of the last completed game for saving
+        self.db_manager = GameHistoryDB() #Shared by every HistoryWindow so the page cache stays warm
 
         self.init_ui()
-        self.init_sounds()
+        QTimer.singleShot(0, self.init_sounds)
 
     #Sound
     def init_sounds(self):
+        """Loads the background music and effect sounds, then starts the music."""
         try:
+            #Game_sound
+            self.game_sound = QSoundEffect()
+            self.game_sound.setSource(QUrl.fromLocalFile(r"c:\Users\85512\Downloads\game-music-loop-6-144641 (online-audio-converter.com).wav"))
+            self.game_sound.setVolume(0.5)
+            self.game_sound.play()
+
             #Win sound
             self.win_sound = QSoundEffect()
             self.win_sound.setSource(QUrl.fromLocalFile(r"c:\Users\85512\Downloads\game-win-36082 (online-audio-converter.com).wav"))
@@ -396,7 +699,8 @@ class TicTacToeGame(QWidget):
                 btn = QPushButton("")
                 btn.setFixedSize(150, 130)
                 btn.setFont(QFont("Arial", 24))
-                btn.setStyleSheet("background-color: #2e2e3e; color: white; border-radius: 10px;")
+                btn.setProperty("mark", "")
+                btn.setStyleSheet(self.CELL_STYLE)
                 btn.clicked.connect(lambda _, x=i, y=j: self.player_move(x, y))
                 self.grid.addWidget(btn, i, j)
                 self.buttons[i][j] = btn
@@ -466,17 +770,16 @@ class TicTacToeGame(QWidget):
     #Player X
     def player_move(self, i, j):
         """Handles a player's move."""
-        if self.buttons[i][j].text() == "":
+        if self.board[i][j] == "":
+            self.board[i][j] = self.current_player
+            self.empty_cells.discard((i, j))
             self.buttons[i][j].setText(self.current_player)
             self.buttons[i][j].setFont(QFont("Arial Black", 40))
             
             # Record the move
             self._game_moves.append({'row': i, 'col': j, 'player': self.current_player})
 
-            if self.current_player == "X":
-                self.buttons[i][j].setStyleSheet("background-color: #2e2e3e; color: #00ffff; border-radius: 10px;")
-            else:
-                self.buttons[i][j].setStyleSheet("background-color: #2e2e3e; color: #ff5e78; border-radius: 10px;")
+            self.set_cell_mark(self.buttons[i][j], self.current_player)
 
             winner = self.check_winner()
             self.show_result(winner)
@@ -495,28 +798,29 @@ class TicTacToeGame(QWidget):
 
         #AI Random
         if self.mode == "Random AI":
-            empty = [(r, c) for r in range(3) for c in range(3) if self.buttons[r][c].text() == ""]
-            if empty:
-                i, j = random.choice(empty)
+            if self.empty_cells:
+                i, j = random.choice(tuple(self.empty_cells))
         #AI Center
         elif self.mode == "Center AI":
-            if self.buttons[1][1].text() == "":
+            if self.board[1][1] == "":
                 i, j = 1, 1
             else:
-                empty = [(r, c) for r in range(3) for c in range(3) if self.buttons[r][c].text() == ""]
-                if empty:
-                    i, j = random.choice(empty)
+                if self.empty_cells:
+                    i, j = random.choice(tuple(self.empty_cells))
         #AI Smart
         elif self.mode == "Smart AI":
-            #Create a simplified board representation for minimax
-            board_state = [[btn.text() for btn in row] for row in self.buttons]
-            
-            _, (move_i, move_j) = self._minimax_find_best_move(board_state, True)
-            i, j = move_i, move_j
+            if len(self.empty_cells) >= 8: #Opening: answer from the book instead of searching
+                taken = [(r, c) for r in range(3) for c in range(3) if self.board[r][c] != ""]
+                i, j = _OPENING_BOOK[taken[0] if taken else None]
+            else:
+                _, (move_i, move_j) = self._minimax_find_best_move(self.board, True)
+                i, j = move_i, move_j
         
-        if i != -1 and j != -1 and self.buttons[i][j].text() == "":
+        if i != -1 and j != -1 and self.board[i][j] == "":
+            self.board[i][j] = "O"
+            self.empty_cells.discard((i, j))
             self.buttons[i][j].setText("O")
-            self.buttons[i][j].setStyleSheet("background-color: #2e2e3e; color: #ff5e78; border-radius: 10px;")
+            self.set_cell_mark(self.buttons[i][j], "O")
             self.buttons[i][j].setFont(QFont("Comic Sans MS", 40))
             
             #Record AI's move
@@ -531,58 +835,20 @@ class TicTacToeGame(QWidget):
         """
         Finds the best move using the Minimax algorithm.
         is_maximizing_player: True for AI ('O'), False for Player ('X')
+        Results are cached per position, so repeated searches are O(1).
         """
-        winner = self._check_winner_board(board)
-        if winner == "O":
-            return 1, None
-        elif winner == "X":
-            return -1, None
-        elif self._is_full_board(board):
-            return 0, None
-
-        if is_maximizing_player: # AI's turn ('O')
-            best_score = -float('inf')
-            best_move = None
-            for r in range(3):
-                for c in range(3):
-                    if board[r][c] == "":
-                        board[r][c] = "O"
-                        score, _ = self._minimax_find_best_move(board, False)
-                        board[r][c] = "" # Undo move
-                        if score > best_score:
-                            best_score = score
-                            best_move = (r, c)
-            return best_score, best_move
-        else: #Player's turn ('X')
-            best_score = float('inf')
-            best_move = None
-            for r in range(3):
-                for c in range(3):
-                    if board[r][c] == "":
-                        board[r][c] = "X"
-                        score, _ = self._minimax_find_best_move(board, True)
-                        board[r][c] = "" # Undo move
-                        if score < best_score:
-                            best_score = score
-                            best_move = (r, c)
-            return best_score, best_move
+        score, move_idx = _minimax_search(*_encode_board(board), is_maximizing_player)
+        if move_idx is None:
+            return score, None
+        return score, divmod(move_idx, 3)
 
     #Helperfunctions for minimax to operate on a board_state (list of lists)
     def _check_winner_board(self, board):
         """Checks for a winner on a given board state."""
-        #Check rows
-        for i in range(3):
-            if board[i][0] == board[i][1] == board[i][2] != "":
-                return board[i][0]
-        #Check columns
-        for i in range(3):
-            if board[0][i] == board[1][i] == board[2][i] != "":
-                return board[0][i]
-        #Check diagonals
-        if board[0][0] == board[1][1] == board[2][2] != "":
-            return board[0][0]
-        if board[0][2] == board[1][1] == board[2][0] != "":
-            return board[0][2]
+        for a, b, c in _WIN_LINES:
+            mark = board[a[0]][a[1]]
+            if mark and mark == board[b[0]][b[1]] == board[c[0]][c[1]]:
+                return mark
         return None
 
     def _is_full_board(self, board):
@@ -591,21 +857,12 @@ class TicTacToeGame(QWidget):
 
     def check_winner(self):
         """Checks rows, columns, and diagonals for a winning line on the current game board."""
-        for i in range(3):
-            if self.buttons[i][0].text() == self.buttons[i][1].text() == self.buttons[i][2].text() != "":
-                return self.buttons[i][0].text()
-            if self.buttons[0][i].text() == self.buttons[1][i].text() == self.buttons[2][i].text() != "":
-                return self.buttons[0][i].text()
-        if self.buttons[0][0].text() == self.buttons[1][1].text() == self.buttons[2][2].text() != "":
-            return self.buttons[0][0].text()
-        if self.buttons[0][2].text() == self.buttons[1][1].text() == self.buttons[2][0].text() != "":
-            return self.buttons[0][2].text()
-        return None
+        return self._check_winner_board(self.board)
     
     #Full Grid
     def is_full(self):
         """Checks if the board is completely filled (draw condition)."""
-        return all(self.buttons[i][j].text() != "" for i in range(3) for j in range(3))
+        return not self.empty_cells
     
     #Show Result
     def show_result(self, winner):
@@ -615,8 +872,10 @@ class TicTacToeGame(QWidget):
             self.result_label_win.setText(f"Player: {winner} Wins! 🎉")
             self.result_label_draw.setText("")
             self.disable_all()
-            self.game_sound.stop() 
-            self.win_sound.play()
+            if self.game_sound:
+                self.game_sound.stop()
+            if self.win_sound:
+                self.win_sound.play()
             label = self.result_label_win
             game_ended = True
             final_winner = winner
@@ -624,8 +883,10 @@ class TicTacToeGame(QWidget):
             self.result_label_draw.setText("It's a Draw! 🤝")
             self.result_label_win.setText("")
             self.disable_all()
-            self.game_sound.stop()
-            self.draw_sound.play()
+            if self.game_sound:
+                self.game_sound.stop()
+            if self.draw_sound:
+                self.draw_sound.play()
             label = self.result_label_draw
             game_ended = True
             final_winner = "Draw"
@@ -651,7 +912,7 @@ class TicTacToeGame(QWidget):
         self.last_game_data = {
             "mode": self.mode,
             "winner": winner,
-            "move_history": list(self._game_moves), #Create a copy
+            "move_history": self._game_moves, #No copy needed: reset_game rebinds _game_moves to a new list
             "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
 
@@ -663,26 +924,42 @@ class TicTacToeGame(QWidget):
 
     def reset_game(self):
         """Resets the game board and state."""
-        self.game_sound.play()
+        if self.game_sound:
+            self.game_sound.play()
         self.result_label_win.setText("")
         self.result_label_draw.setText("")
         self.current_player = "X"
         self._game_moves = [] #Clear move history for new game
+        self.empty_cells = {(r, c) for r in range(3) for c in range(3)}
         self.last_game_data = None #Clear last game data
 
+        #Batch the 9 button updates into a single repaint
+        self.setUpdatesEnabled(False)
         for i in range(3):
             for j in range(3):
+                self.board[i][j] = ""
                 btn = self.buttons[i][j]
                 btn.setText("")
                 btn.setEnabled(True)
-                btn.setStyleSheet("background-color: #2e2e3e; color: white; border-radius: 10px;")
+                self.set_cell_mark(btn, "")
+        self.setUpdatesEnabled(True)
+
+    def set_cell_mark(self, btn, mark):
+        """Re-polishes a board button so CELL_STYLE's [mark] rules apply without re-parsing its stylesheet."""
+        btn.setProperty("mark", mark)
+        btn.style().unpolish(btn)
+        btn.style().polish(btn)
         
     def show_history_window(self):
         """Opens the HistoryWindow to display game history."""
-        #HistoryWindow now handles its own database connection via GameHistoryDB
-        history_dialog = HistoryWindow(self) 
+        history_dialog = HistoryWindow(self, db=self.db_manager)
         history_dialog.exec() #Use exec() for modal dialog
 
+    def closeEvent(self, event):
+        """Overrides the close event to close the shared database connection."""
+        self.db_manager.close_connection()
+        super().closeEvent(event)
+
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     app.setWindowIcon(QIcon(r".venv_TTT_Game_AI/Image/icons8-tic-tac-toe-53.png"))